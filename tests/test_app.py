@@ -3,87 +3,133 @@ Test suite for Mergington High School API
 """
 
 import pytest
-from fastapi.testclient import TestClient
-from src.app import app, activities
-import copy
+from src.app import app, activities, create_app
 
 
-@pytest.fixture
+def _test_client(asgi_app):
+    """Create a test client for the given app"""
+    # Imported lazily so collection does not pay for httpx/starlette.testclient
+    from fastapi.testclient import TestClient
+
+    return TestClient(asgi_app)
+
+
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI app"""
-    return TestClient(app)
+    """Create a single test client shared by the whole test session"""
+    with _test_client(app) as c:
+        yield c
+
+
+# Seed data for the activities database, allocated once at import time
+_ACTIVITIES_SEED = {
+    "Chess Club": {
+        "description": "Learn strategies and compete in chess tournaments",
+        "schedule": "Fridays, 3:30 PM - 5:00 PM",
+        "max_participants": 12,
+        "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
+    },
+    "Programming Class": {
+        "description": "Learn programming fundamentals and build software projects",
+        "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
+        "max_participants": 20,
+        "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
+    },
+    "Gym Class": {
+        "description": "Physical education and sports activities",
+        "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
+        "max_participants": 30,
+        "participants": ["john@mergington.edu", "olivia@mergington.edu"]
+    },
+    "Soccer Team": {
+        "description": "Join the school soccer team and compete in matches",
+        "schedule": "Tuesdays and Thursdays, 4:00 PM - 6:00 PM",
+        "max_participants": 25,
+        "participants": ["alex@mergington.edu"]
+    },
+    "Basketball Club": {
+        "description": "Practice basketball skills and play team games",
+        "schedule": "Mondays and Wednesdays, 3:30 PM - 5:00 PM",
+        "max_participants": 20,
+        "participants": ["sarah@mergington.edu"]
+    },
+    "Art Studio": {
+        "description": "Explore various art mediums including painting and drawing",
+        "schedule": "Thursdays, 3:30 PM - 5:00 PM",
+        "max_participants": 15,
+        "participants": ["lily@mergington.edu"]
+    },
+    "Drama Club": {
+        "description": "Develop acting skills and perform in school plays",
+        "schedule": "Wednesdays, 3:30 PM - 5:30 PM",
+        "max_participants": 18,
+        "participants": ["james@mergington.edu", "emily@mergington.edu"]
+    },
+    "Debate Team": {
+        "description": "Learn argumentation and critical thinking through competitive debates",
+        "schedule": "Fridays, 4:00 PM - 6:00 PM",
+        "max_participants": 16,
+        "participants": ["david@mergington.edu"]
+    },
+    "Science Olympiad": {
+        "description": "Prepare for science competitions and conduct experiments",
+        "schedule": "Tuesdays, 3:30 PM - 5:00 PM",
+        "max_participants": 14,
+        "participants": ["grace@mergington.edu", "lucas@mergington.edu"]
+    }
+}
+
+
+def _clone_activities(src):
+    """Copy an activities dict, sharing the immutable fields and copying participants"""
+    return {
+        name: {
+            "description": meta["description"],
+            "schedule": meta["schedule"],
+            "max_participants": meta["max_participants"],
+            "participants": meta["participants"][:],
+        }
+        for name, meta in src.items()
+    }
+
+
+def _action_url(activity, action, email):
+    """Build the signup/unregister URL for an activity"""
+    return f"/activities/{activity}/{action}?email={email}"
+
+
+# Placeholder students used to fill up an activity
+_FILLER_EMAILS = tuple(f"student{i}@mergington.edu" for i in range(10))
+
+
+@pytest.fixture
+def fresh_app():
+    """Create an app backed by its own copy of the seed data"""
+    return create_app(_clone_activities(_ACTIVITIES_SEED))
+
+
+@pytest.fixture
+def fresh_client(fresh_app):
+    """Create a test client for an isolated app"""
+    with _test_client(fresh_app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def initial_counts():
+    """Participant counts per activity in the seed data"""
+    return {name: len(meta["participants"]) for name, meta in _ACTIVITIES_SEED.items()}
 
 
 @pytest.fixture(autouse=True)
 def reset_activities():
     """Reset activities data before each test"""
-    # Store original activities
-    original = copy.deepcopy(activities)
-    
-    # Reset to original state before each test
-    activities.clear()
-    activities.update({
-        "Chess Club": {
-            "description": "Learn strategies and compete in chess tournaments",
-            "schedule": "Fridays, 3:30 PM - 5:00 PM",
-            "max_participants": 12,
-            "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
-        },
-        "Programming Class": {
-            "description": "Learn programming fundamentals and build software projects",
-            "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
-            "max_participants": 20,
-            "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
-        },
-        "Gym Class": {
-            "description": "Physical education and sports activities",
-            "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
-            "max_participants": 30,
-            "participants": ["john@mergington.edu", "olivia@mergington.edu"]
-        },
-        "Soccer Team": {
-            "description": "Join the school soccer team and compete in matches",
-            "schedule": "Tuesdays and Thursdays, 4:00 PM - 6:00 PM",
-            "max_participants": 25,
-            "participants": ["alex@mergington.edu"]
-        },
-        "Basketball Club": {
-            "description": "Practice basketball skills and play team games",
-            "schedule": "Mondays and Wednesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 20,
-            "participants": ["sarah@mergington.edu"]
-        },
-        "Art Studio": {
-            "description": "Explore various art mediums including painting and drawing",
-            "schedule": "Thursdays, 3:30 PM - 5:00 PM",
-            "max_participants": 15,
-            "participants": ["lily@mergington.edu"]
-        },
-        "Drama Club": {
-            "description": "Develop acting skills and perform in school plays",
-            "schedule": "Wednesdays, 3:30 PM - 5:30 PM",
-            "max_participants": 18,
-            "participants": ["james@mergington.edu", "emily@mergington.edu"]
-        },
-        "Debate Team": {
-            "description": "Learn argumentation and critical thinking through competitive debates",
-            "schedule": "Fridays, 4:00 PM - 6:00 PM",
-            "max_participants": 16,
-            "participants": ["david@mergington.edu"]
-        },
-        "Science Olympiad": {
-            "description": "Prepare for science competitions and conduct experiments",
-            "schedule": "Tuesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 14,
-            "participants": ["grace@mergington.edu", "lucas@mergington.edu"]
-        }
-    })
-    
-    yield
-    
-    # Restore original state after test
+    # Nothing to do if the previous test left the data untouched
+    if activities == _ACTIVITIES_SEED:
+        return
+
     activities.clear()
-    activities.update(original)
+    activities.update(_clone_activities(_ACTIVITIES_SEED))
 
 
 class TestRootEndpoint:
@@ -134,38 +180,22 @@ class TestSignupActivity:
     
     def test_signup_success(self, client):
         """Test successful signup for an activity"""
-        response = client.post("/activities/Chess Club/signup?email=newstudent@mergington.edu")
+        response = client.post(_action_url("Chess Club", "signup", "newstudent@mergington.edu"))
         assert response.status_code == 200
         data = response.json()
         assert "message" in data
         assert "newstudent@mergington.edu" in data["message"]
         
         # Verify participant was added
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert "newstudent@mergington.edu" in activities_data["Chess Club"]["participants"]
-    
-    def test_signup_nonexistent_activity(self, client):
-        """Test signup for non-existent activity returns 404"""
-        response = client.post("/activities/Nonexistent Club/signup?email=student@mergington.edu")
-        assert response.status_code == 404
-        assert "Activity not found" in response.json()["detail"]
-    
-    def test_signup_already_registered(self, client):
-        """Test signup when already registered returns 400"""
-        response = client.post("/activities/Chess Club/signup?email=michael@mergington.edu")
-        assert response.status_code == 400
-        assert "Already signed up" in response.json()["detail"]
+        assert "newstudent@mergington.edu" in activities["Chess Club"]["participants"]
     
     def test_signup_full_activity(self, client):
         """Test signup when activity is full returns 400"""
         # Fill up Chess Club (max 12 participants, currently has 2)
-        for i in range(10):
-            response = client.post(f"/activities/Chess Club/signup?email=student{i}@mergington.edu")
-            assert response.status_code == 200
-        
+        activities["Chess Club"]["participants"].extend(_FILLER_EMAILS)
+
         # Try to add one more
-        response = client.post("/activities/Chess Club/signup?email=overflow@mergington.edu")
+        response = client.post(_action_url("Chess Club", "signup", "overflow@mergington.edu"))
         assert response.status_code == 400
         assert "full" in response.json()["detail"].lower()
     
@@ -175,9 +205,7 @@ class TestSignupActivity:
         assert response.status_code == 200
         
         # Verify participant was added
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert "newcoder@mergington.edu" in activities_data["Programming Class"]["participants"]
+        assert "newcoder@mergington.edu" in activities["Programming Class"]["participants"]
 
 
 class TestUnregisterActivity:
@@ -186,72 +214,76 @@ class TestUnregisterActivity:
     def test_unregister_success(self, client):
         """Test successful unregistration from an activity"""
         # First verify the participant exists
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert "michael@mergington.edu" in activities_data["Chess Club"]["participants"]
+        assert "michael@mergington.edu" in activities["Chess Club"]["participants"]
         
         # Unregister
-        response = client.post("/activities/Chess Club/unregister?email=michael@mergington.edu")
+        response = client.post(_action_url("Chess Club", "unregister", "michael@mergington.edu"))
         assert response.status_code == 200
         data = response.json()
         assert "message" in data
         assert "michael@mergington.edu" in data["message"]
         
         # Verify participant was removed
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert "michael@mergington.edu" not in activities_data["Chess Club"]["participants"]
-    
-    def test_unregister_nonexistent_activity(self, client):
-        """Test unregister from non-existent activity returns 404"""
-        response = client.post("/activities/Nonexistent Club/unregister?email=student@mergington.edu")
-        assert response.status_code == 404
-        assert "Activity not found" in response.json()["detail"]
-    
-    def test_unregister_not_registered(self, client):
-        """Test unregister when not registered returns 400"""
-        response = client.post("/activities/Chess Club/unregister?email=notregistered@mergington.edu")
-        assert response.status_code == 400
-        assert "Not signed up" in response.json()["detail"]
+        assert "michael@mergington.edu" not in activities["Chess Club"]["participants"]
     
     def test_unregister_then_signup_again(self, client):
         """Test unregister and then sign up again works"""
         # Unregister
-        response = client.post("/activities/Chess Club/unregister?email=michael@mergington.edu")
+        response = client.post(_action_url("Chess Club", "unregister", "michael@mergington.edu"))
         assert response.status_code == 200
         
+        # Verify participant was removed
+        activities_data = client.get("/activities").json()
+        assert "michael@mergington.edu" not in activities_data["Chess Club"]["participants"]
+        
         # Sign up again
-        response = client.post("/activities/Chess Club/signup?email=michael@mergington.edu")
+        response = client.post(_action_url("Chess Club", "signup", "michael@mergington.edu"))
         assert response.status_code == 200
         
         # Verify participant was added back
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
+        activities_data = client.get("/activities").json()
         assert "michael@mergington.edu" in activities_data["Chess Club"]["participants"]
 
 
+class TestErrorResponses:
+    """Tests for error responses shared by the signup and unregister endpoints"""
+    
+    @pytest.mark.parametrize("endpoint", ["signup", "unregister"])
+    def test_nonexistent_activity(self, client, endpoint):
+        """Test non-existent activity returns 404"""
+        response = client.post(_action_url("Nonexistent Club", endpoint, "student@mergington.edu"))
+        assert response.status_code == 404
+        assert "Activity not found" in response.json()["detail"]
+    
+    @pytest.mark.parametrize("endpoint, email, detail", [
+        ("signup", "michael@mergington.edu", "Already signed up"),
+        ("unregister", "notregistered@mergington.edu", "Not signed up"),
+    ])
+    def test_registration_conflict(self, client, endpoint, email, detail):
+        """Test signup when already registered and unregister when not registered return 400"""
+        response = client.post(_action_url("Chess Club", endpoint, email))
+        assert response.status_code == 400
+        assert detail in response.json()["detail"]
+
+
 class TestIntegrationScenarios:
     """Integration tests for common workflows"""
     
-    def test_full_signup_workflow(self, client):
+    def test_full_signup_workflow(self, client, initial_counts):
         """Test complete signup workflow"""
         email = "newstudent@mergington.edu"
         activity = "Drama Club"
         
         # Get initial state
-        initial_response = client.get("/activities")
-        initial_data = initial_response.json()
-        initial_count = len(initial_data[activity]["participants"])
+        initial_count = initial_counts[activity]
         
         # Sign up
-        signup_response = client.post(f"/activities/{activity}/signup?email={email}")
+        signup_response = client.post(_action_url(activity, "signup", email))
         assert signup_response.status_code == 200
         
         # Verify count increased
-        final_response = client.get("/activities")
-        final_data = final_response.json()
-        assert len(final_data[activity]["participants"]) == initial_count + 1
-        assert email in final_data[activity]["participants"]
+        assert len(activities[activity]["participants"]) == initial_count + 1
+        assert email in activities[activity]["participants"]
     
     def test_multiple_activities_signup(self, client):
         """Test signing up for multiple activities"""
@@ -260,33 +292,40 @@ class TestIntegrationScenarios:
         # Sign up for multiple activities
         activities_to_join = ["Chess Club", "Drama Club", "Art Studio"]
         for activity in activities_to_join:
-            response = client.post(f"/activities/{activity}/signup?email={email}")
+            response = client.post(_action_url(activity, "signup", email))
             assert response.status_code == 200
         
         # Verify signed up for all
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        for activity in activities_to_join:
-            assert email in activities_data[activity]["participants"]
+        joined = {a for a in activities_to_join if email in activities[a]["participants"]}
+        assert joined == set(activities_to_join)
     
-    def test_availability_decreases_on_signup(self, client):
+    def test_availability_decreases_on_signup(self, client, initial_counts):
         """Test that availability decreases correctly on signup"""
         activity = "Chess Club"
         
         # Get initial availability
-        initial_response = client.get("/activities")
-        initial_data = initial_response.json()
-        initial_count = len(initial_data[activity]["participants"])
-        max_participants = initial_data[activity]["max_participants"]
+        initial_count = initial_counts[activity]
+        max_participants = _ACTIVITIES_SEED[activity]["max_participants"]
         initial_spots = max_participants - initial_count
         
         # Sign up a student
-        client.post(f"/activities/{activity}/signup?email=newbie@mergington.edu")
+        client.post(_action_url(activity, "signup", "newbie@mergington.edu"))
         
         # Check new availability
-        final_response = client.get("/activities")
-        final_data = final_response.json()
-        final_count = len(final_data[activity]["participants"])
+        final_count = len(activities[activity]["participants"])
         final_spots = max_participants - final_count
         
         assert final_spots == initial_spots - 1
+
+
+class TestAppFactory:
+    """Tests for apps built with create_app"""
+    
+    def test_fresh_app_is_isolated(self, fresh_client):
+        """Test that a fresh app does not share state with the global app"""
+        response = fresh_client.post(_action_url("Chess Club", "signup", "isolated@mergington.edu"))
+        assert response.status_code == 200
+        
+        data = fresh_client.get("/activities").json()
+        assert "isolated@mergington.edu" in data["Chess Club"]["participants"]
+        assert "isolated@mergington.edu" not in activities["Chess Club"]["participants"]